@@ -4,14 +4,21 @@
 # Copyright (c) 2016 Mr Mofumofu
 # ========================================
 
+import collections
+import contextlib
 import os
 
 import bpy
 import bmesh
 import mathutils
-from bpy.props import (BoolProperty, FloatProperty, StringProperty, EnumProperty)
+import numpy
+from bpy.props import (BoolProperty, FloatProperty, StringProperty, EnumProperty, CollectionProperty)
 from bpy_extras.io_utils import (ImportHelper, ExportHelper)
 
+from . import reader
+from .cache import (PartCache, contentKey, surfKey)
+from .writer import (SurfWriter, faceCorners, writeSurf, writeParts, encodeParts, writeFiles, spoolSection, copySections)
+
 # Infomation
 bl_info = {
     'name'       : 'SURF/DynaModel Format',
@@ -25,136 +32,161 @@ bl_info = {
     'category'   : 'Import-Export'
 }
 
+# Vertex Coordinates(Transformed by Matrix and Moved to Axis)
+def meshVertices(mesh, matrix, axis):
+    co = numpy.empty(len(mesh.vertices) * 3, dtype=numpy.float32)
+    mesh.vertices.foreach_get('co', co)
+    matrix = numpy.array(matrix, dtype=numpy.float64)
+    return co.reshape(-1, 3).dot(matrix[:3, :3].T) + (matrix[:3, 3] - numpy.array(axis))
+
+# Face Corners(Flat Loop Arrays in Face Order)
+def meshFaces(mesh):
+    loop_start = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+    loop_total = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+    loop_verts = numpy.empty(len(mesh.loops), dtype=numpy.int32)
+    mesh.polygons.foreach_get('loop_start', loop_start)
+    mesh.polygons.foreach_get('loop_total', loop_total)
+    mesh.loops.foreach_get('vertex_index', loop_verts)
+    offsets, corners = faceCorners(loop_start, loop_total, loop_verts)
+    return offsets, loop_total, corners
+
+# Smoothing Flags(Vertex has Smooth Face, and All Edges are Smooth if edges)
+def meshSmooth(mesh, loop_total, corners, edges=False):
+    # Scatter Smooth Faces to Vertices
+    use_smooth = numpy.empty(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get('use_smooth', use_smooth)
+    smooth = numpy.zeros(len(mesh.vertices), dtype=bool)
+    smooth[corners[numpy.repeat(use_smooth, loop_total)]] = True
+    # Scatter Sharp Edges to Vertices
+    if edges:
+        edge_verts = numpy.empty(len(mesh.edges) * 2, dtype=numpy.int32)
+        use_edge_sharp = numpy.empty(len(mesh.edges), dtype=bool)
+        mesh.edges.foreach_get('vertices', edge_verts)
+        mesh.edges.foreach_get('use_edge_sharp', use_edge_sharp)
+        smooth[edge_verts.reshape(-1, 2)[use_edge_sharp].ravel()] = False
+    return smooth
+
+# Material Index of Faces
+def meshMaterials(mesh, count):
+    mats = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+    mesh.polygons.foreach_get('material_index', mats)
+    return numpy.clip(mats, 0, max(count - 1, 0))
+
+# Record of Empty Slot(No C Line and Default COL like Faces without Material)
+EMPTY_RECORD = {
+    'color' : '',
+    'col' : 'COL 128 128 128\n',
+    'bright' : False,
+    'alpha' : None,
+}
+
+# Material Records(Encoded Once per Slot)
+def slotRecords(obj):
+    records = []
+    for slot in obj.material_slots:
+        material = slot.material
+        # Empty Slot(Material Deleted)
+        if material is None:
+            records.append(EMPTY_RECORD)
+            continue
+        color = material.diffuse_color * 255.0
+        records.append({
+            'color' : 'C {:.0f} {:.0f} {:.0f}\n'.format(*color),
+            'col' : 'COL {:.0f} {:.0f} {:.0f}\n'.format(*color),
+            'bright' : material.emit > 0.0,
+            'alpha' : (1.0 - material.alpha) * 228.0 if material.alpha < 1.0 else None,
+        })
+    return records
+
+# World Matrix without Rotation(Location and Scale Only)
+def unrotatedMatrix(obj):
+    scale = mathutils.Matrix.Identity(4)
+    for i in range(3):
+        scale[i][i] = obj.scale[i]
+    return mathutils.Matrix.Translation(obj.location) * scale
+
+# Modifier Evaluated Mesh(Temporary Datablock, Removed after Use)
+@contextlib.contextmanager
+def evaluatedMesh(obj, scene):
+    mesh = obj.to_mesh(scene, True, 'PREVIEW', calc_tessface=False)
+    try:
+        yield mesh
+    finally:
+        bpy.data.meshes.remove(mesh)
+
+# Snapshot of Mesh(Plain Arrays for Encoding, Object Data if No mesh)
+def meshSnapshot(obj, scale=1.0, flip=False, twoside=False, edges=False, mesh=None, location=None, matrix=None):
+    if mesh is None:
+        mesh = obj.data
+    if location is None:
+        location = obj.location
+    if matrix is None:
+        matrix = obj.matrix_world
+    # Transform
+    ys_matrix = mathutils.Matrix((
+        (-1.0 * scale,  0.0,  0.0,  0.0),
+        ( 0.0,  0.0,  1.0 * scale,  0.0),
+        ( 0.0, -1.0 * scale,  0.0,  0.0),
+        ( 0.0,  0.0,  0.0,  1.0),
+    ))
+    # Set Axis
+    local_axis = ys_matrix.to_3x3() * location
+    # Vertexs and Faces
+    offsets, loop_total, corners = meshFaces(mesh)
+    records = slotRecords(obj)
+
+    return {
+        'verts' : meshVertices(mesh, ys_matrix * matrix, local_axis),
+        'smooth' : meshSmooth(mesh, loop_total, corners, edges),
+        'offsets' : offsets,
+        'totals' : loop_total,
+        'corners' : corners,
+        'mats' : meshMaterials(mesh, len(records)),
+        'records' : records,
+        'flip' : flip,
+        'twoside' : twoside,
+    }
+
+# PCK Text Cache in User Data Directory
+def partCache():
+    return PartCache(bpy.utils.user_resource('DATAFILES', os.path.join('export_srf', 'pck_cache'), True))
+
 # Surface Class
 class Surface:
     # Getting Data
-    def __init__(self, obj, scene, scale=1.0, parts=False):
+    def __init__(self, obj, scene, session, scale=1.0, parts=False, matrix=None):
         self.obj = obj
-        # Apply Modifier
-        bpy.context.scene.objects.active = obj
-        bpy.ops.object.modifier_apply(modifier='EdgeSplit')
-        # Set Location and Scale
-        self.location = obj.location
+        self.matrix = matrix
+        self.scene = scene
+        self.session = session
+        # Set Location, Rotation and Scale
+        self.location = session.objectLocation(obj)
+        self.rotation = session.objectRotation(obj)
         self.scale = scale
         # File name
         self.name = '{}.srf'.format(self.obj.name)
         if parts:
             self.name = 'parts/{}.srf'.format(self.obj.name)
+        # Body Referenced by FIL(Shared with Instances of Linked Mesh)
+        self.file = self.name
         # ID
-        self.uid = SurfMan().getUID()
-        SurfMan().addUID()
+        self.uid = session.getUID()
+        session.addUID()
+        # Children(Filled by ExportSession.collect)
         self.children = []
 
-        for objs in (ob for ob in obj.children if ob.is_visible(scene) and ob.type == 'MESH'):
-            self.children.append(SurfMan().getUID())
-            SurfMan().addList(Surface(objs, scene, scale, parts))
-
-    # PCK Node
-    def pck(self, parts=False, ground=False):
-        # ==============================
-        # Getting Data
-        # ==============================
-        # Convert to BMesh(For N-Sided Polygon)
-        bm = bmesh.new()
-        bm.from_mesh(self.obj.data)
-        # Transform
-        ys_matrix = mathutils.Matrix((
-            (-1.0 * self.scale,  0.0,  0.0,  0.0),
-            ( 0.0,  0.0,  1.0 * self.scale,  0.0),
-            ( 0.0, -1.0 * self.scale,  0.0,  0.0),
-            ( 0.0,  0.0,  0.0,  1.0),
-        ))
-        bm.transform(ys_matrix * self.obj.matrix_world)
-        bm.normal_update()
-        # Set Axis
-        local_axis = ys_matrix.to_3x3() * self.obj.location
-        # Vertexs and Faces
-        verts = bm.verts
-        faces = bm.faces
-
-        # ==============================
-        # Output
-        # ==============================
-        output = ''
-        za = ''
-        zacount = 0
-
-        # Header
-        output += 'SURF\n'
-
-        # Vertexs
-        for vert in verts:
-            vertex = vert.co - local_axis
-            output += 'V {:.5f} {:.5f} {:.5f} '.format(*vertex)
-            # Smoothing
-            for face in vert.link_faces:
-                if face.smooth:
-                    output += 'R'
-                    break
-            output += '\n'
-
-        # Faces
-        for face in faces:
-            output += 'F\n'
-
-            # Has Material?
-            if len(self.obj.material_slots):
-                # Getting Material
-                material = self.obj.material_slots[face.material_index].material
-                # Color
-                color = material.diffuse_color * 255.0
-                output += 'C {:.0f} {:.0f} {:.0f}\n'.format(*color)
-                # Lighting
-                if material.emit > 0.0:
-                    output += 'B\n'
-                # Transparent
-                if material.alpha < 1.0:
-                    if zacount == 0:
-                        za += 'ZA {:d} {:.0f}'.format(face.index, (1.0 - material.alpha) * 228.0)
-                    elif zacount % 8 == 0:
-                        za += '\nZA {:d} {:.0f}'.format(face.index, (1.0 - material.alpha) * 228.0)
-                    else:
-                        za += ' {:d} {:.0f}'.format(face.index, (1.0 - material.alpha) * 228.0)
-                    zacount = zacount + 1
-
-            # Median and Normal
-            median = face.calc_center_median_weighted() - local_axis
-            normal = -face.normal
-            if SurfMan().flip:
-                normal = face.normal
-            output += 'N {:.5f} {:.5f} {:.5f} '.format(*median)
-            output += '{:.5f} {:.5f} {:.5f}\n'.format(*normal)
-
-            # Vertexs consist Face
-            output += 'V'
-            face_verts = ''
-            for vid in face.verts:
-                face_verts = ' {:d}{}'.format(vid.index, face_verts)
-            output += face_verts
-            output += '\n'
-            output += 'E\n'
-
-        # Footer
-        output += 'E\n'
-
-        # For Transparent
-        if za != '':
-            output += za + '\n'
-
-        # Finalize
-        length = len(output.split('\n')) - 1
-        result = 'PCK {} {:d}\n{}\n'.format(self.name, length, output)
-        if parts:
-            result = output
+    # PCK Name(None for Parts File)
+    def pckName(self, parts=False, ground=False):
         if ground:
-            result = 'PCK {}.srf {:d}\n{}\n'.format(self.name.split('.')[0], length, output)
-
-        # ==============================
-        # Close
-        # ==============================
-        bm.free()
+            return '{}.srf'.format(self.name.split('.')[0])
+        if parts:
+            return None
+        return self.name
 
-        return result
+    # Snapshot of Mesh(Modifiers like EdgeSplit Applied to Temporary Mesh)
+    def snapshot(self):
+        with evaluatedMesh(self.obj, self.scene) as mesh:
+            return meshSnapshot(self.obj, self.scale, self.session.flip, mesh=mesh, location=self.location, matrix=self.matrix)
 
     #　SRF Node
     def srf(self):
@@ -169,11 +201,11 @@ class Surface:
             ( 0.0,  0.0,  0.0,  1.0),
         ))
         # Set Axis
-        local_axis = ys_matrix.to_3x3() * self.obj.location
+        local_axis = ys_matrix.to_3x3() * self.location
         local_rotate = [
-            -self.obj.rotation_euler.z * 10430.37835,
-            self.obj.rotation_euler.x * 10430.37835,
-            -self.obj.rotation_euler.y * 10430.37835,
+            -self.rotation.z * 10430.37835,
+            self.rotation.x * 10430.37835,
+            -self.rotation.y * 10430.37835,
         ]
 
         # ==============================
@@ -183,13 +215,13 @@ class Surface:
 
         # Status
         output += 'SRF "{:04d}"\n'.format(self.uid)
-        output += 'FIL {}\n'.format(self.name)
+        output += 'FIL {}\n'.format(self.file)
         output += 'CLA 0\n'
         output += 'NST 0\n'
 
         # Support Axis Export
         if self.obj.parent is not None:
-            local_axis_parent = ys_matrix.to_3x3() * self.obj.parent.location
+            local_axis_parent = ys_matrix.to_3x3() * self.session.objectLocation(self.obj.parent)
             local_axis_pos = local_axis - local_axis_parent
             if local_axis_parent == (0, 0, 0):
                 output += 'POS 0.0000 0.0000 0.0000 {:.0f} {:.0f} {:.0f} 1\n'.format(*local_rotate)
@@ -205,31 +237,26 @@ class Surface:
         # Support Parent-Children Relation Export
         output += 'REL DEP\n'
         output += 'NCH {:d}\n'.format(len(self.children))
-        for uid in self.children:
-            output += 'CLD "{:04d}"\n'.format(uid)
+        for child in self.children:
+            output += 'CLD "{:04d}"\n'.format(child.uid)
         output += 'END\n'
 
         return output
 
-# Surface Manager
-class SurfMan(object):
-    _instance = None
-    _list = []
-    _saved = []
-    _uid = 0
-    flip = False
-
-    # Singleton
-    def __new__(this, *argarray, **argdict):
-        if this._instance is None:
-            this._instance = object.__new__(this, *argarray, **argdict)
-        return this._instance
+# Export Session(Parts, UIDs and Settings of One Export)
+class ExportSession:
+    def __init__(self, flip=False, transform=False):
+        self.flip = flip
+        self.transform = transform
+        self._list = []
+        self._saved = {}
+        self._uid = 0
 
     # Add List
     def addList(self, obj):
-        if not obj.name in self._saved:
+        if not obj.obj.name in self._saved:
             self._list.append(obj)
-            self._saved.append(obj.name)
+            self._saved[obj.obj.name] = obj
 
     # Get List
     def getList(self):
@@ -243,11 +270,97 @@ class SurfMan(object):
     def getUID(self):
         return self._uid
 
-    # Finalize
-    def free(self):
-        self._list = []
-        self._saved = []
-        self._uid = 0
+    # Location of Object(World Location if Rotation and Scale are Applied)
+    def objectLocation(self, obj):
+        if self.transform:
+            return obj.matrix_world.to_translation()
+        return obj.location
+
+    # Rotation of Object(Zero if Applied)
+    def objectRotation(self, obj):
+        if self.transform:
+            return mathutils.Euler()
+        return obj.rotation_euler
+
+    # PCK Bodies of Parts(Parts Linking One Mesh with Identical Geometry Share a Body if share)
+    def bodyParts(self, share=True):
+        parts = []
+        bodies = {}
+        for surf in self._list:
+            snapshot = surf.snapshot()
+            if share and surf.obj.data.users > 1:
+                key = (surf.obj.data.name, surfKey(snapshot))
+                if key in bodies:
+                    surf.file = bodies[key].file
+                    continue
+                bodies[key] = surf
+            parts.append((snapshot, surf.pckName()))
+        return parts
+
+    # Collect Visible Meshes from Roots(Each Object Visited Once, UIDs in Breadth First Order)
+    def collect(self, scene, scale=1.0, parts=False):
+        def visible(ob):
+            return ob.is_visible(scene) and ob.type == 'MESH'
+        def byName(ob):
+            return ob.name
+
+        # Roots(No Visible Mesh Parent)
+        roots = [ob for ob in scene.objects if visible(ob) and not (ob.parent is not None and visible(ob.parent))]
+        queue = collections.deque((ob, None) for ob in sorted(roots, key=byName))
+        while queue:
+            obj, parent = queue.popleft()
+            surf = self._saved.get(obj.name)
+            if surf is None:
+                surf = Surface(obj, scene, self, scale, parts)
+                self.addList(surf)
+                queue.extend((ob, surf) for ob in sorted((ob for ob in obj.children if visible(ob)), key=byName))
+            if parent is not None:
+                parent.children.append(surf)
+
+        return self._list
+
+# Axis Conversion of Imported Vertexs
+IMPORT_AXIS = numpy.array((
+    (-1.0,  0.0,  0.0),
+    ( 0.0,  0.0, -1.0),
+    ( 0.0,  1.0,  0.0),
+))
+
+# Node Transform(Location by POS and CNT, Rotation by POS Angles)
+def nodeTransform(node):
+    location = IMPORT_AXIS.dot(numpy.add(node['pos'][:3], node['cnt']))
+    rotation = mathutils.Euler((
+        node['pos'][4] / 10430.37835,
+        -node['pos'][5] / 10430.37835,
+        -node['pos'][3] / 10430.37835,
+    ))
+    return location.tolist(), rotation
+
+# Build Mesh from SURF Data(Axis Converted, Winding Reversed if flip)
+def buildMesh(mesh, surf, mats, flip=False):
+    offsets = surf['offsets']
+    loop_total = surf['totals']
+    corners = surf['corners']
+    # Reverse Winding(Keep First Corner like BMFace.normal_flip)
+    if flip:
+        first = numpy.repeat(offsets, loop_total)
+        step = numpy.arange(len(corners)) - first
+        corners = corners[numpy.where(step == 0, first, first + numpy.repeat(loop_total, loop_total) - step)]
+    # Vertexs
+    mesh.vertices.add(len(surf['verts']))
+    mesh.vertices.foreach_set('co', surf['verts'].dot(IMPORT_AXIS.T).astype(numpy.float32).ravel())
+    # Faces
+    mesh.loops.add(len(corners))
+    mesh.loops.foreach_set('vertex_index', corners)
+    mesh.polygons.add(len(loop_total))
+    mesh.polygons.foreach_set('loop_start', offsets)
+    mesh.polygons.foreach_set('loop_total', loop_total)
+    # Material and Smoothing
+    mesh.polygons.foreach_set('material_index', mats)
+    mesh.polygons.foreach_set('use_smooth', surf['smooth'])
+    # Edges and Normals
+    mesh.update(calc_edges=True)
+    return mesh
 
 # Import SURF
 class ImportSRF(bpy.types.Operator, ImportHelper):
@@ -275,144 +388,31 @@ class ImportSRF(bpy.types.Operator, ImportHelper):
 
     def load(self, context, filename):
         file_path = os.fsencode(filename)
-        with open(file_path, 'r') as file_stream:
-            # Stacks
-            verts = []
-            faces = []
-            materials = {}
-            # Flags
-            vert_flag = True
-            face_flag = False
-            # Temps
-            mat_tmp = {}
-            face_tmp = {}
-
-            # Reader
-            for line_raw in file_stream:
-                # Split with space
-                line_split = line_raw.rstrip().split(' ')
-                # Line idents like 'V' and 'F'...
-                line_ident = line_split[0]
-                # Vertex
-                if line_ident == 'V':
-                    if vert_flag:
-                        smoothing = False
-                        if len(line_split) == 5:
-                            smoothing = True
-                        verts.append({
-                            'vert' : [
-                                float(line_split[1]),
-                                float(line_split[2]),
-                                float(line_split[3]),
-                            ],
-                            'round' : smoothing,
-                        })
-                    else:
-                        for vert_no in line_split[1:]:
-                            face_tmp['vert'].append(int(vert_no))
-                # Face
-                elif line_ident == 'F':
-                    vert_flag = False
-                    face_flag = True
-                    face_tmp['vert'] = []
-                # Color
-                elif line_ident == 'C':
-                    if len(line_split) > 2:
-                        mat_tmp = {
-                            'color' : [
-                                int(line_split[1])/255,
-                                int(line_split[2])/255,
-                                int(line_split[3])/255,
-                            ],
-                            'bright' : 0.0,
-                        }
-                    else:
-                        c=int(line_split[1]) & 32767
-                        g=((c>>10)&31)/31
-                        r=((c>> 5)&31)/31
-                        b=((c    )&31)/31
-                        mat_tmp = {
-                            'color' : [
-                                r,
-                                g,
-                                b,
-                            ],
-                            'bright' : 0.0,
-                        }
-                # Self Brighting
-                elif line_ident == 'B':
-                    mat_tmp['bright'] = 2.0
-                # End of Statement
-                elif line_ident == 'E':
-                    # End of Face
-                    if face_flag:
-                        # Material Matching
-                        if mat_tmp not in materials.values():
-                            # Create Material
-                            materials[len(materials.values()) + 1] = mat_tmp
-                            face_tmp['mats'] = len(materials.values())
-                        # Material Key Finding
-                        else:
-                            for key, var in materials.items():
-                                if var == mat_tmp:
-                                    face_tmp['mats'] = key
-                        faces.append(face_tmp)
-                        # Temp Cleaning
-                        face_tmp = {}
-                        mat_tmp = {}
-                        face_flag = False
-                    # End of SURF
-                    else:
-                        break
-
-            # Generate Mesh
-            file_name = bpy.path.display_name_from_filepath(file_path)
-            mesh = bpy.data.meshes.new(
-                name = file_name,
-            )
-            # Convert Mesh
-            mesh.from_pydata(
-                [vert['vert'] for vert in verts],
-                [],
-                [vert['vert'] for vert in faces],
-            )
-
-            # Convert Material
-            for key, var in materials.items():
-                material = bpy.data.materials.new('{}{}'.format(file_name, key))
-                material.diffuse_color = [
-                    var['color'][0],
-                    var['color'][1],
-                    var['color'][2],
-                ]
-                material.emit = var['bright']
-                mesh.materials.append(material)
-
-            # Set Material
-            for orig, blender in zip(faces, mesh.polygons):
-                blender.material_index = orig['mats'] - 1
-                for face_count in orig['vert']:
-                    if verts[face_count - 1]['round']:
-                        blender.use_smooth = True
-
-            # Fix Mesh
-            bm = bmesh.new()
-            bm.from_mesh(mesh)
-            # Transform
-            ys_matrix = mathutils.Matrix((
-                (-1.0,  0.0,  0.0,  0.0),
-                ( 0.0,  0.0, -1.0,  0.0),
-                ( 0.0,  1.0,  0.0,  0.0),
-                ( 0.0,  0.0,  0.0, -1.0),
-            ))
-            bm.transform(ys_matrix)
-            # Calc Normal
-            bm.normal_update()
-            # Calc Normal
-            for face in bm.faces:
-                face.normal_flip()
-            bm.to_mesh(mesh)
-            return mesh
+        with open(file_path, 'rb') as file_stream:
+            surf = reader.parseSurf(file_stream.read())
+
+        # Generate Mesh
+        file_name = bpy.path.display_name_from_filepath(file_path)
+        mesh = bpy.data.meshes.new(
+            name = file_name,
+        )
+
+        # Convert Material
+        for key, var in enumerate(surf['materials'], 1):
+            material = bpy.data.materials.new('{}{}'.format(file_name, key))
+            material.diffuse_color = var[:3]
+            material.emit = var[3]
+            mesh.materials.append(material)
+
+        # Convert Mesh(Flip Normal)
+        return buildMesh(mesh, surf, surf['mats'], True)
+
+# DNM Part(Import List)
+class DNMPart(bpy.types.PropertyGroup):
+    select = BoolProperty(
+        name = 'Import',
+        default = True,
+    )
 
 # Import DNM
 class ImportDNM(bpy.types.Operator, ImportHelper):
@@ -426,164 +426,104 @@ class ImportDNM(bpy.types.Operator, ImportHelper):
     check_extension = True
     filename_ext = '.dnm'
 
+    # Parts in Selected File
+    parts = CollectionProperty(
+        type = DNMPart,
+        options = {'HIDDEN'},
+    )
+    parts_path = StringProperty(
+        options = {'HIDDEN'},
+    )
+
+    # On Change File(List PCK Nodes)
+    def check(self, context):
+        change = ImportHelper.check(self, context)
+        if self.parts_path != self.filepath:
+            self.parts_path = self.filepath
+            self.parts.clear()
+            if os.path.isfile(self.filepath):
+                for entry in reader.indexDNM(os.fsencode(self.filepath)):
+                    part = self.parts.add()
+                    part.name = entry['name']
+            change = True
+        return change
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text='Parts')
+        for part in self.parts:
+            layout.prop(part, 'select', text=part.name)
+
     # On Click Save Button
     def execute(self, context):
+        # Selected Parts(All Parts if Not Listed)
+        names = None
+        if len(self.parts) and self.parts_path == self.filepath:
+            names = set(part.name for part in self.parts if part.select)
         # Generate
-        self.load(context, self.filepath)
+        self.load(context, self.filepath, names)
         # Scene Update
         context.scene.update()
         return {'FINISHED'}
 
-    def load(self, context, filename):
+    def load(self, context, filename, names=None):
         file_path = os.fsencode(filename)
-        with open(file_path, 'r') as file_stream:
-            # Stacks
-            verts = []
-            faces = []
-            materials = {}
-            material_blender = []
-            # Flags
-            vert_flag = True
-            face_flag = False
-            # Temps
-            surf_name = ""
-            mat_tmp = {}
-            face_tmp = {}
-
-            # Reader
-            for line_raw in file_stream:
-                # Split with space
-                line_split = line_raw.rstrip().split(' ')
-                # Line idents like 'V' and 'F'...
-                line_ident = line_split[0]
-                # PCK Node
-                if line_ident == 'PCK':
-                    surf_name = line_split[1]
-                # Vertex
-                elif line_ident == 'V':
-                    if vert_flag:
-                        smoothing = False
-                        if len(line_split) == 5:
-                            smoothing = True
-                        verts.append({
-                            'vert' : [
-                                float(line_split[1]),
-                                float(line_split[2]),
-                                float(line_split[3]),
-                            ],
-                            'round' : smoothing,
-                        })
-                    else:
-                        face_tmp['vert'] = [int(vert) for vert in line_split[1:]]
-                # Face
-                elif line_ident == 'F':
-                    vert_flag = False
-                    face_flag = True
-                # Color
-                elif line_ident == 'C':
-                    if len(line_split) > 2:
-                        mat_tmp = {
-                            'color' : [
-                                int(line_split[1])/255,
-                                int(line_split[2])/255,
-                                int(line_split[3])/255,
-                            ],
-                            'bright' : 0.0,
-                        }
-                    else:
-                        c=int(line_split[1]) & 32767
-                        g=((c>>10)&31)/31
-                        r=((c>> 5)&31)/31
-                        b=((c    )&31)/31
-                        mat_tmp = {
-                            'color' : [
-                                r,
-                                g,
-                                b,
-                            ],
-                            'bright' : 0.0,
-                        }
-                # Self Brighting
-                elif line_ident == 'B':
-                    mat_tmp['bright'] = 2.0
-                # End of Statement
-                elif line_ident == 'E':
-                    # End of Face
-                    if face_flag:
-                        # Material Matching
-                        if mat_tmp not in materials.values():
-                            # Create Material
-                            materials[len(materials.values()) + 1] = mat_tmp
-                            face_tmp['mats'] = len(materials.values())
-                            # Convert Material
-                            material = bpy.data.materials.new('Material{}'.format(len(materials.values())))
-                            material.diffuse_color = [
-                                mat_tmp['color'][0],
-                                mat_tmp['color'][1],
-                                mat_tmp['color'][2],
-                            ]
-                            material.emit = mat_tmp['bright']
-                            material_blender.append(material)
-                        # Material Key Finding
-                        else:
-                            for key, var in materials.items():
-                                if var == mat_tmp:
-                                    face_tmp['mats'] = key
-                        faces.append(face_tmp)
-                        # Temp Cleaning
-                        face_tmp = {}
-                        mat_tmp = {}
-                        face_flag = False
-                    # End of SURF
-                    else:
-                        # Generate Mesh
-                        mesh = bpy.data.meshes.new(
-                            name = surf_name.split('.')[0],
-                        )
-                        # Convert Mesh
-                        mesh.from_pydata(
-                            [vert['vert'] for vert in verts],
-                            [],
-                            [vert['vert'] for vert in faces],
-                        )
-
-                        # Set Material
-                        for orig, blender in zip(faces, mesh.polygons):
-                            blender.material_index = orig['mats'] - 1
-                            for face_count in orig['vert']:
-                                if verts[face_count - 1]['round']:
-                                    blender.use_smooth = True
-
-
-                        for var in material_blender:
-                            mesh.materials.append(var)
-
-                        # Fix Mesh
-                        bm = bmesh.new()
-                        bm.from_mesh(mesh)
-                        # Transform
-                        ys_matrix = mathutils.Matrix((
-                            (-1.0,  0.0,  0.0,  0.0),
-                            ( 0.0,  0.0, -1.0,  0.0),
-                            ( 0.0,  1.0,  0.0,  0.0),
-                            ( 0.0,  0.0,  0.0, -1.0),
-                        ))
-                        bm.transform(ys_matrix)
-                        # Calc Normal
-                        bm.normal_update()
-                        bm.to_mesh(mesh)
-                        # Create Object
-                        obj = bpy.data.objects.new(mesh.name, mesh)
-                        scene = bpy.context.scene
-                        scene.objects.link(obj)
-
-                        #Cleaning
-                        verts = []
-                        faces = []
-                        vert_flag = True
-                        face_flag = False
-                        surf_name = ""
-            return True
+        # Stacks
+        materials = {}
+        material_blender = []
+        meshes = collections.OrderedDict()
+
+        # Parse in Workers, Create Objects Here
+        index, nodes = reader.scanDNM(file_path)
+        entries = [entry for entry in index if names is None or entry['name'] in names]
+        for surf in reader.parseParts(file_path, entries):
+            # Material Matching(Numbered over Imported Parts)
+            mats = []
+            for var in surf['materials']:
+                if var not in materials:
+                    # Convert Material
+                    materials[var] = len(materials)
+                    material = bpy.data.materials.new('Material{}'.format(len(materials)))
+                    material.diffuse_color = var[:3]
+                    material.emit = var[3]
+                    material_blender.append(material)
+                mats.append(materials[var])
+
+            # Generate Mesh
+            mesh = bpy.data.meshes.new(
+                name = surf['name'].split('.')[0],
+            )
+            for var in material_blender:
+                mesh.materials.append(var)
+            # Convert Mesh
+            buildMesh(mesh, surf, numpy.array(mats, dtype=numpy.int32)[surf['mats']])
+            meshes[surf['name']] = mesh
+
+        scene = bpy.context.scene
+        # Create Objects(Nodes Referencing One FIL Share the Mesh)
+        objects = {}
+        for node in nodes:
+            mesh = meshes.get(node['file'])
+            if mesh is None:
+                continue
+            obj = bpy.data.objects.new(mesh.name, mesh)
+            obj.location, obj.rotation_euler = nodeTransform(node)
+            scene.objects.link(obj)
+            objects[node['name']] = obj
+
+        # Parent-Children Relation
+        for node in nodes:
+            if node['name'] in objects:
+                for child in node['children']:
+                    if child in objects:
+                        objects[child].parent = objects[node['name']]
+
+        # Meshes without Node(Unparented Objects, All Meshes if No Node Tree)
+        files = set(node['file'] for node in nodes)
+        for file_name, mesh in meshes.items():
+            if file_name not in files:
+                scene.objects.link(bpy.data.objects.new(mesh.name, mesh))
+        return True
 
 # Export SURF
 class ExportSRF(bpy.types.Operator, ExportHelper):
@@ -626,131 +566,24 @@ class ExportSRF(bpy.types.Operator, ExportHelper):
 
     # On Click Save Button
     def execute(self, context):
-        # Apply Transform
-        if self.transform == 'On':
-            bpy.ops.object.select_all(action='SELECT')
-            bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
-            bpy.ops.ed.undo()
-
         # Currently Scene
         scene = context.scene
         filepath = os.fsencode(self.filepath)
-        fp = open(filepath, 'w')
 
         # Selected Object
-        fp.write(self.export(scene.objects.active))
+        with open(filepath, 'w') as fp:
+            self.export(fp, scene.objects.active)
 
         return {'FINISHED'}
 
-    def export(self, obj):
-        # ==============================
-        # Getting Data
-        # ==============================
-        # Convert to BMesh(For N-Sided Polygon)
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-        # Transform
-        ys_matrix = mathutils.Matrix((
-            (-1.0,  0.0,  0.0,  0.0),
-            ( 0.0,  0.0,  1.0,  0.0),
-            ( 0.0, -1.0,  0.0,  0.0),
-            ( 0.0,  0.0,  0.0,  1.0),
-        ))
-        bm.transform(ys_matrix * obj.matrix_world)
-        bm.normal_update()
-        # Set Axis
-        local_axis = ys_matrix.to_3x3() * obj.location
-        # Vertexs and Faces
-        verts = bm.verts
-        faces = bm.faces
-
-        # ==============================
-        # Output
-        # ==============================
-        output = ''
-        za = ''
-        zacount = 0
-
-        # Header
-        output += 'SURF\n'
-
-        # Vertexs
-        for vert in verts:
-            vertex = vert.co - local_axis
-            output += 'V {:.5f} {:.5f} {:.5f} '.format(*vertex)
-            # Smoothing
-            smooth = True
-            for edge in vert.link_edges:
-                if edge.smooth == False:
-                    smooth = False
-                    break
-            if smooth:
-                for face in vert.link_faces:
-                    if face.smooth:
-                        output += 'R'
-                        break
-            output += '\n'
-
-        # Faces
-        for face in faces:
-            output += 'F\n'
-
-            # Has Material?
-            if len(obj.material_slots):
-                # Getting Material
-                material = obj.material_slots[face.material_index].material
-                # Color
-                color = material.diffuse_color * 255.0
-                output += 'C {:.0f} {:.0f} {:.0f}\n'.format(*color)
-                # Lighting
-                if material.emit > 0.0:
-                    output += 'B\n'
-                # Transparent
-                if material.alpha < 1.0:
-                    if zacount == 0:
-                        za += 'ZA {:d} {:.0f}'.format(face.index, (1.0 - material.alpha) * 228.0)
-                    elif zacount % 8 == 0:
-                        za += '\nZA {:d} {:.0f}'.format(face.index, (1.0 - material.alpha) * 228.0)
-                    else:
-                        za += ' {:d} {:.0f}'.format(face.index, (1.0 - material.alpha) * 228.0)
-                    zacount = zacount + 1
-
-            # Median and Normal
-            median = face.calc_center_median_weighted() - local_axis
-            # Flip Normal
-            if self.flip_normal == 'On':
-                normal = face.normal
-            else:
-                normal = -face.normal
-            if self.twoside_normal == 'On':
-                output += 'N {:.5f} {:.5f} {:.5f} '.format(*median)
-                output += '0.000 0.000 0.000\n'
-            else:
-                output += 'N {:.5f} {:.5f} {:.5f} '.format(*median)
-                output += '{:.5f} {:.5f} {:.5f}\n'.format(*normal)
-
-            # Vertexs consist Face
-            output += 'V'
-            face_verts = ''
-            for vid in face.verts:
-                face_verts = ' {:d}{}'.format(vid.index, face_verts)
-            output += face_verts
-            output += '\n'
-            output += 'E\n'
-
-        # Footer
-        output += 'E\n'
-
-        # For Transparent
-        if za != '':
-            output += za + '\n'
-
-        # ==============================
-        # Close
-        # ==============================
-        bm.free()
-
-        return output
+    def export(self, fp, obj):
+        # Apply Transform(Vertexs are Moved to World Location)
+        location = None
+        if self.transform == 'On':
+            location = obj.matrix_world.to_translation()
+        # Smoothing(Smooth Face and No Sharp Edge)
+        surf = meshSnapshot(obj, 1.0, self.flip_normal == 'On', self.twoside_normal == 'On', True, location=location)
+        return writeSurf(fp, surf)
 
 # Export DNM
 class ExportDNM(bpy.types.Operator, ExportHelper):
@@ -789,27 +622,24 @@ class ExportDNM(bpy.types.Operator, ExportHelper):
         default=1.0,
     )
 
+    use_cache = BoolProperty(
+        name='Use Cache',
+        default=True,
+    )
+
 
     # On Click Save Button
     def execute(self, context):
         # ==============================
         # Getting Data
         # ==============================
-        # Apply Transform
-        if self.transform == 'On':
-            bpy.ops.object.select_all(action='SELECT')
-            bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
-            bpy.ops.ed.undo()
-        # Flip Normal
-        if self.flip_normal == 'On':
-            SurfMan().flip = True
+        # Export Session(Rotation and Scale Baked into Vertexs if Apply Transform)
+        session = ExportSession(self.flip_normal == 'On', self.transform == 'On')
         # Currently Scene
         scene = context.scene
 
-        # Selected Object
-        for obj in (ob for ob in scene.objects if ob.is_visible(scene) and ob.type == 'MESH'):
-            if obj.type == 'MESH':
-                SurfMan().addList(Surface(obj, scene, self.scale))
+        # Visible Objects from Roots
+        session.collect(scene, self.scale)
 
         # ==============================
         # Output
@@ -823,11 +653,10 @@ class ExportDNM(bpy.types.Operator, ExportHelper):
         fp.write('DNMVER 1\n')
 
         # PCK Node
-        for surf in SurfMan().getList():
-            fp.write(surf.pck())
+        writeParts(fp, session.bodyParts(), partCache() if self.use_cache else None)
 
         # SRF Node
-        for surf in SurfMan().getList():
+        for surf in session.getList():
             fp.write(surf.srf())
 
         # Footer
@@ -836,12 +665,11 @@ class ExportDNM(bpy.types.Operator, ExportHelper):
         # ==============================
         # Close
         # ==============================
-        SurfMan().free()
         fp.close()
 
         return {'FINISHED'}
 
-# Export PCK
+# Export PCK(One PCK Node per Part, No SRF Node References Shared Bodies)
 class ExportPCK(bpy.types.Operator, ExportHelper):
     # Settings
     bl_idname = 'export_model.pck'
@@ -878,27 +706,24 @@ class ExportPCK(bpy.types.Operator, ExportHelper):
         default=1.0,
     )
 
+    use_cache = BoolProperty(
+        name='Use Cache',
+        default=True,
+    )
+
 
     # On Click Save Button
     def execute(self, context):
         # ==============================
         # Getting Data
         # ==============================
-        # Apply Transform
-        if self.transform == 'On':
-            bpy.ops.object.select_all(action='SELECT')
-            bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
-            bpy.ops.ed.undo()
-        # Flip Normal
-        if self.flip_normal == 'On':
-            SurfMan().flip = True
+        # Export Session(Rotation and Scale Baked into Vertexs if Apply Transform)
+        session = ExportSession(self.flip_normal == 'On', self.transform == 'On')
         # Currently Scene
         scene = context.scene
 
-        # Selected Object
-        for obj in (ob for ob in scene.objects if ob.is_visible(scene) and ob.type == 'MESH'):
-            if obj.type == 'MESH':
-                SurfMan().addList(Surface(obj, scene, self.scale))
+        # Visible Objects from Roots
+        session.collect(scene, self.scale)
 
         # ==============================
         # Output
@@ -911,14 +736,12 @@ class ExportPCK(bpy.types.Operator, ExportHelper):
         fp.write('DYNAMODEL\n')
         fp.write('DNMVER 1\n')
 
-        # PCK Node
-        for surf in SurfMan().getList():
-            fp.write(surf.pck())
+        # PCK Node(One per Part, Linked Meshes are Not Shared as No FIL Points at a Shared Body)
+        writeParts(fp, session.bodyParts(False), partCache() if self.use_cache else None)
 
         # ==============================
         # Close
         # ==============================
-        SurfMan().free()
         fp.close()
 
         return {'FINISHED'}
@@ -966,21 +789,13 @@ class ExplodeDNM(bpy.types.Operator, ExportHelper):
         # ==============================
         # Getting Data
         # ==============================
-        # Apply Transform
-        if self.transform == 'On':
-            bpy.ops.object.select_all(action='SELECT')
-            bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
-            bpy.ops.ed.undo()
-        # Flip Normal
-        if self.flip_normal == 'On':
-            SurfMan().flip = True
+        # Export Session(Rotation and Scale Baked into Vertexs if Apply Transform)
+        session = ExportSession(self.flip_normal == 'On', self.transform == 'On')
         # Currently Scene
         scene = context.scene
 
-        # Selected Object
-        for obj in (ob for ob in scene.objects if ob.is_visible(scene) and ob.type == 'MESH'):
-            if obj.type == 'MESH':
-                SurfMan().addList(Surface(obj, scene, self.scale, True))
+        # Visible Objects from Roots
+        session.collect(scene, self.scale, True)
 
         # ==============================
         # Output
@@ -993,16 +808,14 @@ class ExplodeDNM(bpy.types.Operator, ExportHelper):
         fp.write('DYNAMODEL\n')
         fp.write('DNMVER 1\n')
 
-        # PCK Node
-        for surf in SurfMan().getList():
-            filepath = os.fsencode('{}/{}'.format(os.path.dirname(self.filepath), surf.name))
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            pck = open(filepath, 'w')
-            pck.write(surf.pck(True))
-            pck.close()
+        # PCK Node(Unchanged Part Files are Skipped)
+        surfs = session.getList()
+        paths = [os.fsencode('{}/{}'.format(os.path.dirname(self.filepath), surf.name)) for surf in surfs]
+        written, skipped = writeFiles(paths, encodeParts([(surf.snapshot(), None) for surf in surfs]))
+        self.report({'INFO'}, 'Part files: {} written, {} skipped'.format(written, skipped))
 
         # SRF Node
-        for surf in SurfMan().getList():
+        for surf in session.getList():
             fp.write(surf.srf())
 
         # Footer
@@ -1011,7 +824,6 @@ class ExplodeDNM(bpy.types.Operator, ExportHelper):
         # ==============================
         # Close
         # ==============================
-        SurfMan().free()
         fp.close()
 
         return {'FINISHED'}
@@ -1059,37 +871,26 @@ class ExplodeSRF(bpy.types.Operator, ExportHelper):
         # ==============================
         # Getting Data
         # ==============================
-        # Apply Transform
-        if self.transform == 'On':
-            bpy.ops.object.select_all(action='SELECT')
-            bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
-            bpy.ops.ed.undo()
-        # Flip Normal
-        if self.flip_normal == 'On':
-            SurfMan().flip = True
+        # Export Session(Rotation and Scale Baked into Vertexs if Apply Transform)
+        session = ExportSession(self.flip_normal == 'On', self.transform == 'On')
         # Currently Scene
         scene = context.scene
 
-        # Selected Object
-        for obj in (ob for ob in scene.objects if ob.is_visible(scene) and ob.type == 'MESH'):
-            if obj.type == 'MESH':
-                SurfMan().addList(Surface(obj, scene, self.scale, True))
+        # Visible Objects from Roots
+        session.collect(scene, self.scale, True)
 
         # ==============================
         # Output
         # ==============================
-        # PCK Node
-        for surf in SurfMan().getList():
-            filepath = os.fsencode('{}/{}'.format(os.path.dirname(self.filepath), surf.name))
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            pck = open(filepath, 'w')
-            pck.write(surf.pck(True))
-            pck.close()
+        # PCK Node(Unchanged Part Files are Skipped)
+        surfs = session.getList()
+        paths = [os.fsencode('{}/{}'.format(os.path.dirname(self.filepath), surf.name)) for surf in surfs]
+        written, skipped = writeFiles(paths, encodeParts([(surf.snapshot(), None) for surf in surfs]))
+        self.report({'INFO'}, 'Part files: {} written, {} skipped'.format(written, skipped))
 
         # ==============================
         # Close
         # ==============================
-        SurfMan().free()
 
         return {'FINISHED'}
 
@@ -1112,12 +913,17 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
         # Open
         filepath = os.fsencode(self.filepath)
         fp = open(filepath, 'w')
-        pck = 'FIELD\nGND 0 0 128\nSKY 192 224 255\nDEFAREA NOAREA\n'
-        pc2 = ''
-        gnd = ''
-        srf = ''
-        saved_pc2 = []
-        saved_srf = []
+        fp.write('FIELD\nGND 0 0 128\nSKY 192 224 255\nDEFAREA NOAREA\n')
+        # Node Sections(Spooled to Disk over Size Limit)
+        pc2 = spoolSection()
+        gnd = spoolSection()
+        srf = spoolSection()
+        # Body Names by Name Prefix and by Content Key
+        pc2_files = {}
+        srf_files = {}
+        pc2_bodies = {}
+        srf_bodies = {}
+        session = ExportSession()
 
         # All Object
         for obj_pair in sorted(scene.objects.items(), key=lambda x: x[0]):
@@ -1137,7 +943,7 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
                     # ==============================
                     name = stats[0]
                     iff = int(stats[2])
-                    gnd += self.exportGround(obj, name, iff)
+                    gnd.write(self.exportGround(obj, name, iff))
                 elif stats[1] == 'SRF':
                     # ==============================
                     # SRF Object
@@ -1145,81 +951,79 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
 
                     # Get Destination
                     name = stats[0]
-                    output = self.exportSRF(obj, scene)
 
-                    # File Output
-                    if not name in saved_srf:
-                        pck += output[0]
-                        saved_srf.append(name)
+                    # File Output(Identical Geometry Shares One Body)
+                    if not name in srf_files:
+                        surf_obj = Surface(obj, scene, session, matrix=unrotatedMatrix(obj))
+                        surf = surf_obj.snapshot()
+                        key = surfKey(surf)
+                        if not key in srf_bodies:
+                            writeSurf(fp, surf, surf_obj.pckName(ground=True))
+                            srf_bodies[key] = name
+                        srf_files[name] = srf_bodies[key]
 
                     # Node Output
-                    srf += output[1]
+                    srf.write(self.exportSRF(obj, srf_files[name]))
                 else:
                     # Get Destination
                     dst = int(stats[2])
                     name = stats[0]
 
                     # ==============================
-                    # Node Output
+                    # File Output(Identical Geometry Shares One Body)
                     # ==============================
-                    # Transform
-                    ys_matrix = mathutils.Matrix((
-                        ( 1.0,  0.0,  0.0,  0.0),
-                        ( 0.0,  0.0,  1.0,  0.0),
-                        ( 0.0,  1.0,  0.0,  0.0),
-                        ( 0.0,  0.0,  0.0,  1.0),
-                    ))
-                    # Axis
-                    local_axis = ys_matrix.to_3x3() * obj.location
-                    local_rotate = [
-                        obj.rotation_euler.z * 10430.37835,
-                        obj.rotation_euler.x * 10430.37835,
-                        obj.rotation_euler.y * 10430.37835,
-                    ]
-
-                    # Header
-                    pc2 += 'PC2\n'
-
-                    # FIL
-                    pc2 += 'FIL {}.pc2\n'.format(stats[0])
-
-                    # POS
-                    pc2 += 'POS {:.2f} 0.00 {:.2f} '.format(local_axis[0], local_axis[2])
-                    pc2 += '{:.0f} {:.0f} {:.0f} 1\n'.format(*local_rotate)
-
-                    # ID
-                    pc2 += 'ID 0\n'
-
-                    # Footer
-                    pc2 += 'END\n\n'
+                    if not name in pc2_files:
+                        key = self.keyPC2(obj, stats[1], dst)
+                        if not key in pc2_bodies:
+                            # Header(PICT2, ENDPICT and Trailing Blank Line)
+                            writer = SurfWriter(fp)
+                            writer.write('PCK "{}.pc2" {}\n'.format(name, self.lengthPC2(obj, stats[1], dst) + 3))
+                            writer.write('PICT2\n')
+                            # Check Object Type
+                            if stats[1] == 'POLY':
+                                self.exportPoly(writer, obj, dst)
+                            elif stats[1] == 'LIGHT':
+                                self.exportLightStatic(writer, obj, dst)
+                            elif stats[1] == 'LINE':
+                                self.exportLine(writer, obj, dst)
+                            # End
+                            writer.write('ENDPICT\n\n')
+                            pc2_bodies[key] = name
+                        pc2_files[name] = pc2_bodies[key]
 
                     # ==============================
-                    # File Output
+                    # Node Output
                     # ==============================
+                    pc2.write(self.exportNodePC2(obj, pc2_files[name]))
 
-                    if not name in saved_pc2:
-                        # Reset
-                        obj.rotation_euler = (0.0, 0.0, 0.0)
-                        # Check Object Type
-                        result = 'PICT2\n'
-                        if stats[1] == 'POLY':
-                            result += self.exportPoly(obj, dst)
-                        elif stats[1] == 'LIGHT':
-                            result += self.exportLightStatic(obj, dst)
-                        elif stats[1] == 'LINE':
-                            result += self.exportLine(obj, dst)
-                        # End
-                        result += "ENDPICT\n"
-
-                        # Write
-                        pck += 'PCK "{}.pc2" {}\n{}\n'.format(name, len(result.split('\n')), result)
-                        saved_pc2.append(name)
-
-        fp.write(pck + gnd + srf+ pc2)
+        # Node Output(Sections Copied in Blocks)
+        copySections(fp, (gnd, srf, pc2))
         fp.close()
         return {'FINISHED'}
 
-    def exportPoly(self, obj, dst):
+    def keyPC2(self, obj, kind, dst):
+        # Content Key(Scaled Vertexs, Topology and Material Slots)
+        mesh = obj.data
+        offsets, loop_total, corners = meshFaces(mesh)
+        edge_verts = numpy.empty(len(mesh.edges) * 2, dtype=numpy.int32)
+        mesh.edges.foreach_get('vertices', edge_verts)
+        verts = meshVertices(mesh, unrotatedMatrix(obj), obj.location)
+        cols = [record['col'] for record in slotRecords(obj)]
+        return contentKey(kind, dst, cols, verts, loop_total, corners, edge_verts, meshMaterials(mesh, len(cols)))
+
+    def lengthPC2(self, obj, kind, dst):
+        # Lines per Record
+        mesh = obj.data
+        record = 1 if dst else 0
+        if kind == 'POLY':
+            return len(mesh.loops) + len(mesh.polygons) * (record + 4)
+        elif kind == 'LIGHT':
+            return len(mesh.vertices) + record + 3
+        elif kind == 'LINE':
+            return len(mesh.edges) * (record + 5)
+        return 0
+
+    def exportPoly(self, writer, obj, dst):
         # ==============================
         # Getting Data
         # ==============================
@@ -1233,7 +1037,7 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
             ( 0.0,  1.0,  0.0,  0.0),
             ( 0.0,  0.0,  0.0,  1.0),
         ))
-        bm.transform(ys_matrix * obj.matrix_world)
+        bm.transform(ys_matrix * unrotatedMatrix(obj))
         bm.normal_update()
         # Set Axis
         local_axis = ys_matrix.to_3x3() * obj.location
@@ -1241,8 +1045,8 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
         verts = bm.verts
         verts.ensure_lookup_table()
         faces = bm.faces
-
-        output = ''
+        # Material Records
+        cols = [record['col'] for record in slotRecords(obj)]
 
         # ==============================
         # Output
@@ -1251,38 +1055,35 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
         # Faces
         for face in faces:
             # Header
-            output += 'PLG\n'
+            writer.write('PLG\n')
 
             # Destination
             if(dst):
-                output += 'DST {:.2f}\n'.format(dst)
+                writer.write('DST {:.2f}\n'.format(dst))
 
             # Getting Material
-            if len(obj.material_slots):
-                material = obj.material_slots[face.material_index].material
-                # Color
-                color = material.diffuse_color * 255.0
-                output += 'COL {:.0f} {:.0f} {:.0f}\n'.format(*color)
+            if len(cols):
+                writer.write(cols[face.material_index])
             else:
-                output += 'COL 128 128 128\n'
+                writer.write('COL 128 128 128\n')
 
             # Vertex
             for vid in face.verts:
                 vertex = verts[vid.index].co - local_axis
-                output += 'VER {:.2f} {:.2f}\n'.format(vertex.x, vertex.z)
+                writer.write('VER {:.2f} {:.2f}\n'.format(vertex.x, vertex.z))
 
             # Footer
-            output += 'SPEC FALSE\n'
-            output += 'ENDO\n'
+            writer.write('SPEC FALSE\n')
+            writer.write('ENDO\n')
 
         # ==============================
         # Close
         # ==============================
         bm.free()
 
-        return output
+        return writer.lines
 
-    def exportLightStatic(self, obj, dst):
+    def exportLightStatic(self, writer, obj, dst):
         # ==============================
         # Getting Data
         # ==============================
@@ -1296,51 +1097,48 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
             ( 0.0,  1.0,  0.0,  0.0),
             ( 0.0,  0.0,  0.0,  1.0),
         ))
-        bm.transform(ys_matrix * obj.matrix_world)
+        bm.transform(ys_matrix * unrotatedMatrix(obj))
         bm.normal_update()
         # Set Axis
         local_axis = ys_matrix.to_3x3() * obj.location
         # Vertexs and Faces
         verts = bm.verts
         verts.ensure_lookup_table()
-
-        output = ''
+        # Material Records
+        cols = [record['col'] for record in slotRecords(obj)]
 
         # ==============================
         # Output
         # ==============================
 
         # Header
-        output += 'PST\n'
+        writer.write('PST\n')
 
         # Destination
         if(dst):
-            output += 'DST {:.2f}\n'.format(dst)
+            writer.write('DST {:.2f}\n'.format(dst))
         # Getting Material
-        if(len(obj.material_slots)):
-            material = obj.material_slots[0].material
-            # Color
-            color = material.diffuse_color * 255.0
-            output += 'COL {:.0f} {:.0f} {:.0f}\n'.format(*color)
+        if len(cols):
+            writer.write(cols[0])
         else:
-            output += 'COL 128 128 128\n'
+            writer.write('COL 128 128 128\n')
 
         # Faces
         for vert in verts:
             vertex = vert.co - local_axis
-            output += 'VER {:.2f} {:.2f}\n'.format(vertex.x, vertex.z)
+            writer.write('VER {:.2f} {:.2f}\n'.format(vertex.x, vertex.z))
 
         # Footer
-        output += 'ENDO\n'
+        writer.write('ENDO\n')
 
         # ==============================
         # Close
         # ==============================
         bm.free()
 
-        return output
+        return writer.lines
 
-    def exportLine(self, obj, dst):
+    def exportLine(self, writer, obj, dst):
         # ==============================
         # Getting Data
         # ==============================
@@ -1354,7 +1152,7 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
             ( 0.0,  1.0,  0.0,  0.0),
             ( 0.0,  0.0,  0.0,  1.0),
         ))
-        bm.transform(ys_matrix * obj.matrix_world)
+        bm.transform(ys_matrix * unrotatedMatrix(obj))
         bm.normal_update()
         # Set Axis
         local_axis = ys_matrix.to_3x3() * obj.location
@@ -1362,8 +1160,8 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
         verts = bm.verts
         verts.ensure_lookup_table()
         edges = bm.edges
-
-        output = ''
+        # Material Records
+        cols = [record['col'] for record in slotRecords(obj)]
 
         # ==============================
         # Output
@@ -1372,55 +1170,85 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
         # Faces
         for edge in edges:
             # Header
-            output += 'QST\n'
+            writer.write('QST\n')
 
             # Destination
             if(dst):
-                output += 'DST {:.2f}\n'.format(dst)
+                writer.write('DST {:.2f}\n'.format(dst))
 
             # Getting Material
-            if len(obj.material_slots):
-                material = obj.material_slots[0].material
-                # Color
-                color = material.diffuse_color * 255.0
-                output += 'COL {:.0f} {:.0f} {:.0f}\n'.format(*color)
+            if len(cols):
+                writer.write(cols[0])
             else:
-                output += 'COL 128 128 128\n'
+                writer.write('COL 128 128 128\n')
 
             # Vertex
-            for vid in face.verts:
+            for vid in edge.verts:
                 vertex = verts[vid.index].co - local_axis
-                output += 'VER {:.2f} {:.2f}\n'.format(vertex.x, vertex.z)
+                writer.write('VER {:.2f} {:.2f}\n'.format(vertex.x, vertex.z))
 
             # Footer
-            output += 'ENDO\n'
+            writer.write('ENDO\n')
 
         # ==============================
         # Close
         # ==============================
         bm.free()
 
+        return writer.lines
+
+    def exportNodePC2(self, obj, name):
+        # ==============================
+        # Getting Data(Transform Only)
+        # ==============================
+        ys_matrix = mathutils.Matrix((
+            ( 1.0,  0.0,  0.0,  0.0),
+            ( 0.0,  0.0,  1.0,  0.0),
+            ( 0.0,  1.0,  0.0,  0.0),
+            ( 0.0,  0.0,  0.0,  1.0),
+        ))
+        # Axis
+        local_axis = ys_matrix.to_3x3() * obj.location
+        local_rotate = [
+            obj.rotation_euler.z * 10430.37835,
+            obj.rotation_euler.x * 10430.37835,
+            obj.rotation_euler.y * 10430.37835,
+        ]
+
+        output = ''
+
+        # ==============================
+        # Output
+        # ==============================
+
+        # Header
+        output += 'PC2\n'
+
+        # FIL
+        output += 'FIL {}.pc2\n'.format(name)
+
+        # POS
+        output += 'POS {:.2f} 0.00 {:.2f} '.format(local_axis[0], local_axis[2])
+        output += '{:.0f} {:.0f} {:.0f} 1\n'.format(*local_rotate)
+
+        # ID
+        output += 'ID 0\n'
+
+        # Footer
+        output += 'END\n\n'
+
         return output
 
     def exportGround(self, obj, name, iff):
         # ==============================
-        # Getting Data
+        # Getting Data(Transform Only)
         # ==============================
-        # Convert to BMesh(For N-Sided Polygon)
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-        # Transform
         ys_matrix = mathutils.Matrix((
             ( 1.0,  0.0,  0.0,  0.0),
             ( 0.0,  0.0,  1.0,  0.0),
             ( 0.0,  1.0,  0.0,  0.0),
             ( 0.0,  0.0,  0.0,  1.0),
         ))
-        bm.transform(ys_matrix * obj.matrix_world)
-        bm.normal_update()
-        # Vertexs and Faces
-        verts = bm.verts
-        verts.ensure_lookup_table()
         # Axis
         local_axis = ys_matrix.to_3x3() * obj.location
         local_rotate = [
@@ -1454,14 +1282,9 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
         # Footer
         output += 'END\n'
 
-        # ==============================
-        # Close
-        # ==============================
-        bm.free()
-
         return output
 
-    def exportSRF(self, obj, scene):
+    def exportSRF(self, obj, name):
         # ==============================
         # Getting Data
         # ==============================
@@ -1479,19 +1302,11 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
             obj.rotation_euler.y * 10430.37835,
         ]
 
-        # ==============================
-        # Output(SURF)
-        # ==============================
-        # Reset Rotation
-        obj.rotation_euler = (0.0, 0.0, 0.0)
-        # Export
-        surf_obj = Surface(obj, scene)
-        pck = surf_obj.pck(False, True)
+        output = ''
 
         # ==============================
-        # Output(Node)
+        # Output
         # ==============================
-        output = ''
 
         # Header
         output += 'SRF\n'
@@ -1500,7 +1315,7 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
         output += 'ID 0\n'
 
         # NAM
-        output += 'FIL {}.srf\n'.format(surf_obj.name.split('.')[0])
+        output += 'FIL {}.srf\n'.format(name)
 
         # POS
         output += 'POS {:.2f} {:.2f} {:.2f} '.format(*local_axis)
@@ -1509,7 +1324,7 @@ class ExportFLD(bpy.types.Operator, ExportHelper):
         # Footer
         output += 'END\n'
 
-        return [pck, output]
+        return output
 
 # Menu Button(Import)
 def menu_import(self, context):
@@ -0,0 +1,101 @@
+# ========================================
+# SURF/DynaModel Plugin for Blender
+#
+# Copyright (c) 2016 Mr Mofumofu
+# ========================================
+
+import hashlib
+import os
+
+import numpy
+
+from .writer import ENCODER_VERSION
+
+# Cache Size Limit(Bytes)
+CACHE_LIMIT = 256 * 1024 * 1024
+
+# Snapshot Arrays Hashed for Cache Key
+SURF_ARRAYS = ('verts', 'smooth', 'offsets', 'totals', 'corners', 'mats')
+
+# Content Key of Arrays and Plain Values
+def contentKey(*values):
+    digest = hashlib.sha1()
+    for value in values:
+        if isinstance(value, numpy.ndarray):
+            data = numpy.ascontiguousarray(value)
+            digest.update('{} {}\n'.format(data.dtype.str, data.shape).encode('utf-8'))
+            digest.update(data.tobytes())
+        else:
+            digest.update('{!r}\n'.format(value).encode('utf-8'))
+    return digest.hexdigest()
+
+# Cache Key of SURF Snapshot(Transform and Scale are Baked into Vertexs, Encoder Version Included)
+def surfKey(surf, name=None):
+    # Material Slot Values
+    records = [sorted(record.items()) for record in surf['records']]
+    return contentKey(ENCODER_VERSION, name, bool(surf['flip']), bool(surf['twoside']), records, *(surf[key] for key in SURF_ARRAYS))
+
+# On-Disk PCK Text Cache(Least Recently Used Entries are Evicted)
+class PartCache:
+    def __init__(self, directory, limit=CACHE_LIMIT):
+        self.directory = directory
+        self.limit = limit
+        os.makedirs(directory, exist_ok=True)
+
+    # Entry Path
+    def path(self, key):
+        return os.path.join(self.directory, key + '.pck')
+
+    # Cache Key
+    def key(self, surf, name=None):
+        return surfKey(surf, name)
+
+    # Entry Exists
+    def has(self, key):
+        return os.path.isfile(self.path(key))
+
+    # Cached Text(None if Missing)
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as fp:
+                text = fp.read()
+            # Mark as Recently Used
+            os.utime(path)
+        except OSError:
+            return None
+        return text
+
+    # Store Text(Temp File and Rename)
+    def put(self, key, text):
+        path = self.path(key)
+        temp = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            with open(temp, 'w', encoding='utf-8', newline='') as fp:
+                fp.write(text)
+            os.replace(temp, path)
+        except OSError:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    # Evict Oldest Entries over Size Limit
+    def trim(self):
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith('.pck'):
+                continue
+            path = os.path.join(self.directory, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(entry[1] for entry in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total = total - size
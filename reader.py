@@ -0,0 +1,419 @@
+# ========================================
+# SURF/DynaModel Plugin for Blender
+#
+# Copyright (c) 2016 Mr Mofumofu
+# ========================================
+
+import os
+import warnings
+from array import array
+from itertools import repeat
+
+import numpy
+
+from .workers import forkPool
+
+# Color of Face without C Line
+DEFAULT_COLOR = (1.0, 1.0, 1.0)
+
+# Packed 15-bit Colors(GGGGGRRRRRBBBBB)
+PACKED_COLORS = [
+    (((c>> 5)&31)/31, ((c>>10)&31)/31, ((c    )&31)/31)
+    for c in range(32768)
+]
+
+# Compact SURF Data
+def surfData(name, verts, rounds, totals, corners, mats, materials, za):
+    verts = numpy.asarray(verts, dtype=numpy.float64).reshape(-1, 3)
+    rounds = numpy.asarray(rounds, dtype=bool)
+    totals = numpy.asarray(totals, dtype=numpy.int32)
+    corners = numpy.asarray(corners, dtype=numpy.int32)
+    # Face Offsets(CSR)
+    offsets = numpy.zeros(len(totals), dtype=numpy.int32)
+    numpy.cumsum(totals[:-1], out=offsets[1:])
+    # Smoothing(Any Vertex of Face is Round)
+    smooth = numpy.zeros(len(totals), dtype=bool)
+    valid = totals > 0
+    if valid.any():
+        smooth[valid] = numpy.logical_or.reduceat(rounds[corners], offsets[valid])
+    # Transparent(Face and Alpha Pairs)
+    za = numpy.asarray(za, dtype=numpy.int32).reshape(-1, 2)
+
+    return {
+        'name' : name,
+        'verts' : verts,
+        'rounds' : rounds,
+        'offsets' : offsets,
+        'totals' : totals,
+        'corners' : corners,
+        'smooth' : smooth,
+        'mats' : numpy.asarray(mats, dtype=numpy.int32),
+        'materials' : materials,
+        'za' : za,
+    }
+
+# Whitespace Bytes(Same as str.isspace for ASCII)
+SPACES = numpy.array([chr(c).isspace() for c in range(128)] + [False] * 128)
+
+# Line Breaks of str.splitlines other than Newline
+BREAKS = b'\r\x0b\x0c\x1c\x1d\x1e'
+
+# Tokens of Each Line and Numbers with Idents Removed(ASCII Bytes of count Lines)
+def bulkTokens(raw, count, idents):
+    data = numpy.frombuffer(raw, dtype=numpy.uint8)
+    # Token Heads(Non-Space after Space)
+    space = data <= 32
+    head = ~space
+    head[1:] &= space[:-1]
+    ends = numpy.flatnonzero(data == 10)
+    if len(ends) != count or (count and ends[-1] != len(data) - 1):
+        return None
+    # Token Count of Each Line
+    starts = numpy.zeros(count, dtype=numpy.int64)
+    starts[1:] = ends[:-1] + 1
+    tokens = numpy.add.reduceat(head, starts, dtype=numpy.int64) if count else numpy.zeros(0, dtype=numpy.int64)
+    for ident in idents:
+        raw = raw.replace(ident, b' ')
+    return tokens, raw
+
+# Numbers from Text(None if Count Mismatch)
+def bulkNumbers(text, dtype, count):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            numbers = numpy.fromstring(text, dtype=dtype, sep=' ')
+        except ValueError:
+            return None
+    if len(numbers) != count:
+        return None
+    return numbers
+
+# Vertex Lines in Bulk('V x y z [R]', None if Irregular)
+def bulkVerts(raw, count):
+    data = bulkTokens(raw, count, (b'V', b'R'))
+    if data is None:
+        return None
+    tokens, text = data
+    rounds = tokens == 5
+    if ((tokens != 4) & ~rounds).any():
+        return None
+    verts = bulkNumbers(text, numpy.float64, count * 3)
+    if verts is None:
+        return None
+    return verts, rounds
+
+# Vertex Lines One by One
+def lineVerts(vert_lines):
+    verts = array('d')
+    rounds = array('b')
+    for line_raw in vert_lines:
+        line_split = line_raw.split()
+        verts.extend((float(line_split[1]), float(line_split[2]), float(line_split[3])))
+        rounds.append(len(line_split) == 5)
+    return verts, rounds
+
+# Face Index Lines in Bulk('V a b c ...', None if Irregular)
+def bulkIndices(raw, count):
+    data = bulkTokens(raw, count, (b'V',))
+    if data is None:
+        return None
+    totals = data[0] - 1
+    corners = bulkNumbers(data[1], numpy.int32, int(totals.sum()))
+    if corners is None:
+        return None
+    return corners, totals
+
+# Face Index Lines One by One
+def lineIndices(face_lines):
+    corners = array('i')
+    totals = array('i')
+    for line_raw in face_lines:
+        line_split = line_raw.split()
+        corners.extend([int(vert_no) for vert_no in line_split[1:]])
+        totals.append(len(line_split) - 1)
+    return corners, totals
+
+# Color of C Line
+def lineColor(line_split):
+    if len(line_split) > 2:
+        return (
+            int(line_split[1])/255,
+            int(line_split[2])/255,
+            int(line_split[3])/255,
+        )
+    return PACKED_COLORS[int(line_split[1]) & 32767]
+
+# Last Line of Kind at or before Each Line(-1 if None)
+def lastLines(kind):
+    return numpy.maximum.accumulate(numpy.where(kind, numpy.arange(len(kind)), -1))
+
+# Parse SURF Bytes in Bulk(Newline Only, Line Kinds Located with NumPy, None if Irregular or Not ASCII)
+def bulkSurf(raw, name):
+    if not raw or any(byte in raw for byte in BREAKS):
+        return None
+    if not raw.endswith(b'\n'):
+        raw = raw + b'\n'
+    data = numpy.frombuffer(raw, dtype=numpy.uint8)
+    if (data >= 128).any():
+        return None
+    # Lines(Start and End Offsets)
+    ends = numpy.flatnonzero(data == 10)
+    starts = numpy.zeros(len(ends), dtype=numpy.int64)
+    starts[1:] = ends[:-1] + 1
+    sizes = ends - starts + 1
+
+    # Line idents like 'V' and 'F'...(Same as line_raw[:2].rstrip())
+    head = numpy.frombuffer(raw + b'  ', dtype=numpy.uint8)
+    first = head[starts]
+    second = head[starts + 1]
+    single = SPACES[second]
+    kind_v = (first == ord('V')) & single
+    kind_f = (first == ord('F')) & single
+    kind_c = (first == ord('C')) & single
+    kind_b = (first == ord('B')) & single
+    kind_e = (first == ord('E')) & single
+    kind_za = (first == ord('Z')) & (second == ord('A'))
+
+    # Face Flag before Each Line(Set by F, Cleared by E)
+    last = lastLines(kind_f | kind_e)
+    face_flag = numpy.zeros(len(ends), dtype=bool)
+    face_flag[1:] = (last[:-1] >= 0) & kind_f[numpy.maximum(last[:-1], 0)]
+    # Vertexs(V Lines before First F)
+    vert_flag = numpy.arange(len(ends)) < (numpy.argmax(kind_f) if kind_f.any() else len(ends))
+    vert_lines = kind_v & vert_flag
+    # Faces(V Lines in Face, Numbered by E Lines Closing Faces)
+    face_lines = kind_v & ~vert_flag & face_flag
+    closes = kind_e & face_flag
+    face_ids = numpy.cumsum(closes)[face_lines]
+
+    # Vertex and Face Index Lines
+    vert_data = bulkVerts(data[numpy.repeat(vert_lines, sizes)].tobytes(), int(vert_lines.sum()))
+    face_data = bulkIndices(data[numpy.repeat(face_lines, sizes)].tobytes(), int(face_lines.sum()))
+    if vert_data is None or face_data is None:
+        return None
+    totals = numpy.bincount(face_ids, weights=face_data[1], minlength=int(closes.sum()))
+
+    # Material of Faces(Last C and B Lines since Previous Closed Face)
+    close_lines = numpy.flatnonzero(closes)
+    previous = numpy.full(len(close_lines), -1, dtype=numpy.int64)
+    previous[1:] = close_lines[:-1]
+    color_lines = lastLines(kind_c)[close_lines]
+    bright = lastLines(kind_b)[close_lines] > numpy.maximum(color_lines, previous)
+    color_lines = numpy.where(color_lines > previous, color_lines, -1)
+    # Colors of C Lines(Distinct Line Texts are Parsed Once, Same Color Values Share ID)
+    used = numpy.unique(color_lines[color_lines >= 0])
+    width = int(sizes[used].max()) if len(used) else 1
+    columns = numpy.arange(width)
+    chars = numpy.where(columns < sizes[used, None], data[numpy.minimum(starts[used, None] + columns, len(data) - 1)], 0)
+    texts, text_ids = numpy.unique(numpy.ascontiguousarray(chars).view('S{}'.format(width)).ravel(), return_inverse=True)
+    color_keys = {DEFAULT_COLOR : 0}
+    colors = [DEFAULT_COLOR]
+    text_colors = []
+    for text in texts.tolist():
+        color = lineColor(text.split())
+        if color not in color_keys:
+            color_keys[color] = len(colors)
+            colors.append(color)
+        text_colors.append(color_keys[color])
+    # Color ID of Faces(Default Color without C Line)
+    used_ids = numpy.array(text_colors, dtype=numpy.int64)[text_ids.ravel()]
+    color_ids = numpy.zeros(len(color_lines), dtype=numpy.int64)
+    colored = color_lines >= 0
+    color_ids[colored] = used_ids[numpy.searchsorted(used, color_lines[colored])]
+    # Material Matching(Numbered by First Use)
+    keys, index, inverse = numpy.unique(color_ids * 2 + bright, return_index=True, return_inverse=True)
+    order = numpy.argsort(index)
+    rank = numpy.empty(len(keys), dtype=numpy.int32)
+    rank[order] = numpy.arange(len(keys))
+    materials = [colors[key // 2] + (2.0 if key % 2 else 0.0,) for key in keys[order].tolist()]
+
+    # Transparent
+    za = array('i')
+    for za_line in numpy.flatnonzero(kind_za).tolist():
+        za.extend([int(var) for var in raw[starts[za_line]:ends[za_line]].split()[1:]])
+
+    return surfData(name, vert_data[0], vert_data[1], totals, face_data[0], rank[inverse], materials, za)
+
+# Parse SURF Lines One by One
+def lineSurf(lines, name=''):
+    # Stacks
+    vert_lines = []
+    face_lines = []
+    face_ids = array('i')
+    mats = array('i')
+    za = array('i')
+    materials = []
+    material_keys = {}
+    # Flags
+    vert_flag = True
+    face_flag = False
+    # Temps
+    color = DEFAULT_COLOR
+    bright = 0.0
+
+    # Reader(Vertex and Face Index Lines are Converted Later)
+    for line_raw in lines:
+        # Line idents like 'V' and 'F'...
+        line_ident = line_raw[:2].rstrip()
+        # Vertex
+        if line_ident == 'V':
+            if vert_flag:
+                vert_lines.append(line_raw)
+            elif face_flag:
+                face_lines.append(line_raw)
+                face_ids.append(len(mats))
+        # Face
+        elif line_ident == 'F':
+            vert_flag = False
+            face_flag = True
+        # Color
+        elif line_ident == 'C':
+            color = lineColor(line_raw.split())
+            bright = 0.0
+        # Self Brighting
+        elif line_ident == 'B':
+            bright = 2.0
+        # End of Statement
+        elif line_ident == 'E':
+            # End of Face
+            if face_flag:
+                # Material Matching
+                mat_key = color + (bright,)
+                if mat_key not in material_keys:
+                    material_keys[mat_key] = len(materials)
+                    materials.append(mat_key)
+                mats.append(material_keys[mat_key])
+                # Temp Cleaning
+                color = DEFAULT_COLOR
+                bright = 0.0
+                face_flag = False
+        # Transparent
+        elif line_ident == 'ZA':
+            za.extend([int(var) for var in line_raw.split()[1:]])
+
+    # Vertexs
+    vert_data = lineVerts(vert_lines)
+    # Faces
+    face_data = lineIndices(face_lines)
+    totals = numpy.bincount(
+        numpy.asarray(face_ids, dtype=numpy.int64),
+        weights=numpy.asarray(face_data[1], dtype=numpy.float64),
+        minlength=len(mats),
+    )
+
+    return surfData(name, vert_data[0], vert_data[1], totals, face_data[0], mats, materials, za)
+
+# Parse SURF Bytes(CRLF Normalized, Fall Back to Line by Line for Irregular Input)
+def parseSurf(raw, name=''):
+    raw = raw.replace(b'\r\n', b'\n')
+    return bulkSurf(raw, name) or lineSurf(raw.decode('utf-8', 'replace').splitlines(True), name)
+
+# Bytes Read at Once when Skipping Lines
+SCAN = 1024 * 1024
+
+# Skip count Lines of File(Read in Chunks, to End of File if Fewer Lines)
+def skipLines(fp, count):
+    while count:
+        start = fp.tell()
+        chunk = fp.read(SCAN)
+        if not chunk:
+            break
+        found = chunk.count(b'\n')
+        if found < count:
+            count = count - found
+            continue
+        # Line End in This Chunk
+        view = numpy.frombuffer(chunk, dtype=numpy.uint8)
+        fp.seek(start + int(numpy.flatnonzero(view == 10)[count - 1]) + 1)
+        break
+    return fp.tell()
+
+# Token without Quotes
+def unquote(token):
+    return token.decode('utf-8', 'replace').strip('"')
+
+# Top Level Lines of DNM File(Split Line and PCK Body Range, PCK Bodies are Skipped)
+def topLines(fp):
+    for line_raw in iter(fp.readline, b''):
+        line_split = line_raw.split()
+        body = None
+        # PCK Node(Skip Body by Declared Line Count)
+        if len(line_split) >= 3 and line_split[0] == b'PCK' and line_split[2].isdigit():
+            count = int(line_split[2])
+            offset = fp.tell()
+            body = {
+                'offset' : offset,
+                'length' : skipLines(fp, count) - offset,
+                'lines' : count,
+            }
+        yield line_split, body
+
+# PCK Index and SRF Node Tree of DNM File in One Pass
+# (Name, Byte Offset, Byte Length and Line Count per PCK Node, Name, FIL, POS, CNT and Children per SRF Node)
+def scanLines(fp):
+    index = []
+    nodes = []
+    node = None
+    for line_split, body in topLines(fp):
+        # PCK Node
+        if body is not None:
+            body['name'] = unquote(line_split[1])
+            index.append(body)
+            continue
+        if not line_split:
+            continue
+        line_ident = line_split[0]
+        # Start of Node
+        if line_ident == b'SRF':
+            node = {
+                'name' : unquote(line_split[1]) if len(line_split) > 1 else '',
+                'file' : None,
+                'pos' : (0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+                'cnt' : (0.0, 0.0, 0.0),
+                'children' : [],
+            }
+            nodes.append(node)
+        elif node is None:
+            continue
+        # File Name
+        elif line_ident == b'FIL' and len(line_split) > 1:
+            node['file'] = unquote(line_split[1])
+        # Position and Rotation
+        elif line_ident == b'POS' and len(line_split) >= 7:
+            node['pos'] = tuple(float(var) for var in line_split[1:7])
+        # Rotation Center
+        elif line_ident == b'CNT' and len(line_split) >= 4:
+            node['cnt'] = tuple(float(var) for var in line_split[1:4])
+        # Children
+        elif line_ident == b'CLD' and len(line_split) > 1:
+            node['children'].append(unquote(line_split[1]))
+        # End of Node
+        elif line_ident == b'END':
+            node = None
+    return index, nodes
+
+# PCK Index and SRF Node Tree of DNM File(No Geometry is Parsed, PCK Bodies are Skipped in Chunks)
+def scanDNM(file_path):
+    with open(file_path, 'rb') as fp:
+        return scanLines(fp)
+
+# PCK Index of DNM File
+def indexDNM(file_path):
+    return scanDNM(file_path)[0]
+
+# Parse PCK Node from Index Entry
+def parsePCK(file_path, entry):
+    with open(file_path, 'rb') as fp:
+        fp.seek(entry['offset'])
+        raw = fp.read(entry['length'])
+    return parseSurf(raw, entry['name'])
+
+# Parse Indexed PCK Nodes in Index Order(Process Pool if Workers are Forked)
+def parseParts(file_path, entries):
+    executor = forkPool() if len(entries) > 1 else None
+    if executor is not None:
+        with executor:
+            yield from executor.map(parsePCK, repeat(file_path), entries)
+    else:
+        for entry in entries:
+            yield parsePCK(file_path, entry)
@@ -0,0 +1,147 @@
+# ========================================
+# SURF/DynaModel Plugin for Blender
+#
+# Copyright (c) 2016 Mr Mofumofu
+# ========================================
+
+import importlib
+import io
+import os
+import random
+import sys
+import tempfile
+import types
+import unittest
+
+import numpy
+
+# Package Modules without bpy(Package __init__ is Not Run)
+# Run from tests Directory or by python -m unittest discover -s tests
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if 'export_srf' not in sys.modules:
+    package = types.ModuleType('export_srf')
+    package.__path__ = [ROOT]
+    sys.modules['export_srf'] = package
+reader = importlib.import_module('export_srf.reader')
+writer = importlib.import_module('export_srf.writer')
+
+# SURF Text(Irregular Layouts if weird)
+def surfText(seed, verts, faces, weird=False):
+    r = random.Random(seed)
+    lines = ['SURF\n']
+    if r.random() < 0.3:
+        lines.append('C 1234\n')
+    for i in range(verts):
+        lines.append('V {:.3f} {:.3f} {:.3f}{}\n'.format(r.random(), r.random(), r.random(), ' R' if r.random() < 0.3 else ' '))
+        if weird and r.random() < 0.05:
+            lines.append('\n')
+    for i in range(faces):
+        lines.append('F\n')
+        c = r.random()
+        if c < 0.3:
+            lines.append('C {} {} {}\n'.format(r.randrange(3), r.randrange(3), 255))
+        elif c < 0.5:
+            lines.append('C {}\n'.format(r.randrange(4)))
+        if r.random() < 0.2:
+            lines.append('B\n')
+        if weird and r.random() < 0.2:
+            lines.append('C 7\n')
+        lines.append('N 0 0 0 0 0 1\n')
+        lines.append('V' + ''.join(' {}'.format(r.randrange(verts)) for j in range(r.randrange(3, 6))) + '\n')
+        if weird and r.random() < 0.1:
+            lines.append('V 0 0 0\n')
+        lines.append('E\n')
+        if weird and r.random() < 0.1:
+            lines.append('E\n')
+        if weird and r.random() < 0.1:
+            lines.append('B\n')
+    lines.append('E\n')
+    lines.append('ZA 0 100 1 50\n')
+    text = ''.join(lines)
+    if weird and r.random() < 0.5:
+        text = text.rstrip('\n')
+    return text
+
+# Snapshot of Random Mesh for Encoding
+def surfSnapshot(seed, verts, faces, twoside=False):
+    r = numpy.random.RandomState(seed)
+    totals = r.randint(3, 6, size=faces)
+    offsets = numpy.zeros(faces, dtype=numpy.int64)
+    numpy.cumsum(totals[:-1], out=offsets[1:])
+    records = [
+        {'color' : 'C 255 0 0\n', 'col' : 'COL 255 0 0\n', 'bright' : False, 'alpha' : None},
+        {'color' : 'C 0 255 0\n', 'col' : 'COL 0 255 0\n', 'bright' : True, 'alpha' : 100.0},
+        {'color' : '', 'col' : 'COL 128 128 128\n', 'bright' : False, 'alpha' : None},
+    ]
+    return {
+        'verts' : r.rand(verts, 3),
+        'smooth' : r.rand(verts) < 0.5,
+        'offsets' : offsets,
+        'totals' : totals,
+        'corners' : r.randint(0, verts, size=int(totals.sum())),
+        'mats' : r.randint(0, len(records), size=faces),
+        'records' : records,
+        'flip' : False,
+        'twoside' : twoside,
+    }
+
+class SurfReaderTest(unittest.TestCase):
+    def assertSurfEqual(self, first, second):
+        self.assertEqual(sorted(first), sorted(second))
+        for key in first:
+            if isinstance(first[key], numpy.ndarray):
+                numpy.testing.assert_array_equal(first[key], second[key], err_msg=key)
+            else:
+                self.assertEqual(first[key], second[key], key)
+
+    def testBulkMatchesLines(self):
+        for seed in range(200):
+            text = surfText(seed, seed % 19 + 1, seed % 23, seed % 2 == 1)
+            bulk = reader.bulkSurf(text.encode('ascii'), 'part')
+            self.assertIsNotNone(bulk)
+            self.assertSurfEqual(bulk, reader.lineSurf(text.splitlines(True), 'part'))
+
+    def testCRLFMatchesLines(self):
+        for seed in range(50):
+            text = surfText(seed, 10, 10, True)
+            surf = reader.parseSurf(text.replace('\n', '\r\n').encode('ascii'), 'part')
+            self.assertSurfEqual(surf, reader.lineSurf(text.splitlines(True), 'part'))
+
+    def testIrregularFallsBack(self):
+        text = surfText(1, 5, 5)
+        for line in ('V 1 2 3 R X\n', 'C 1 2 3 é\n', 'N 0 0 0\x0c0 0 1\n', 'E\r\n'):
+            lines = text.splitlines(True)
+            lines.insert(3, line)
+            raw = ''.join(lines).encode('utf-8')
+            self.assertIsNone(reader.bulkSurf(raw, 'part'))
+            self.assertSurfEqual(reader.parseSurf(raw, 'part'), reader.lineSurf(raw.decode('utf-8').splitlines(True), 'part'))
+
+class SurfWriterTest(unittest.TestCase):
+    def testPCKLineCount(self):
+        for seed, twoside in ((0, False), (1, True), (2, False)):
+            surf = surfSnapshot(seed, 40, 30 + seed, twoside)
+            fp = io.StringIO()
+            lines = writer.writeSurf(fp, surf, 'part.srf')
+            text = fp.getvalue().split('\n')
+            # Header, Body and Trailing Blank Line
+            self.assertEqual(text[-2:], ['', ''])
+            self.assertEqual(int(text[0].split()[2]), len(text) - 3)
+            self.assertEqual(lines, len(text) - 2)
+
+    def testPartsRoundTrip(self):
+        parts = [(surfSnapshot(seed, 20, 15), 'part{}.srf'.format(seed)) for seed in range(3)]
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'model.dnm')
+            with open(file_path, 'w') as fp:
+                fp.write('DYNAMODEL\nDNMVER 1\n')
+                writer.writeParts(fp, parts)
+                fp.write('END\n')
+            index, nodes = reader.scanDNM(file_path)
+            self.assertEqual([entry['name'] for entry in index], [name for surf, name in parts])
+            for (surf, name), entry in zip(parts, index):
+                parsed = reader.parsePCK(file_path, entry)
+                self.assertEqual(len(parsed['verts']), len(surf['verts']))
+                numpy.testing.assert_array_equal(parsed['totals'], surf['totals'])
+
+if __name__ == '__main__':
+    unittest.main()
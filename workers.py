@@ -0,0 +1,27 @@
+# ========================================
+# SURF/DynaModel Plugin for Blender
+#
+# Copyright (c) 2016 Mr Mofumofu
+# ========================================
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Workers would be Forked(Start Method is Left Unfixed for Other Add-ons)
+def forkWorkers():
+    method = multiprocessing.get_start_method(allow_none=True)
+    if method is None:
+        # Default Method is Listed First
+        method = multiprocessing.get_all_start_methods()[0]
+    return method == 'fork'
+
+# Process Pool with Forked Workers(None if Workers would Not be Forked)
+def forkPool():
+    if not forkWorkers():
+        return None
+    try:
+        # Explicit Context Leaves the Start Method Unfixed
+        return ProcessPoolExecutor(mp_context=multiprocessing.get_context('fork'))
+    except TypeError:
+        # No mp_context before Python 3.7
+        return ProcessPoolExecutor()
@@ -0,0 +1,259 @@
+# ========================================
+# SURF/DynaModel Plugin for Blender
+#
+# Copyright (c) 2016 Mr Mofumofu
+# ========================================
+
+import io
+import os
+import shutil
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+import numpy
+
+from .workers import forkPool
+
+# Rows per Formatting Pass
+CHUNK = 65536
+
+# Bytes of Section Kept in Memory before Spooling to Disk
+SPOOL = 1024 * 1024
+
+# Version of SURF Text Encoding(Bump when Output Format Changes)
+ENCODER_VERSION = 1
+
+# Face Records
+FACE = '{}N {:.5f} {:.5f} {:.5f} {:.5f} {:.5f} {:.5f}\nV{}\nE\n'
+FACE_TWOSIDE = '{}N {:.5f} {:.5f} {:.5f} 0.000 0.000 0.000\nV{}\nE\n'
+
+# Count of ZA Lines(8 Faces per Line)
+def zaLength(count):
+    return (count + 7) // 8
+
+# Face Headers(Color and Lighting) and ZA Entries from Slot Records
+def faceHeads(records, mats):
+    if not len(records):
+        return ['F\n'] * len(mats), []
+    heads = numpy.array(['F\n{}{}'.format(record['color'], 'B\n' if record['bright'] else '') for record in records], dtype=object)
+    alpha = numpy.array([numpy.nan if record['alpha'] is None else record['alpha'] for record in records])[mats]
+    faces = numpy.flatnonzero(~numpy.isnan(alpha))
+    return heads[mats], list(zip(faces.tolist(), alpha[faces].tolist()))
+
+# Face Corners(Vertex Index of Each Loop in Face Order)
+def faceCorners(loop_start, loop_total, loop_verts):
+    offsets = numpy.zeros(len(loop_total), dtype=numpy.int64)
+    numpy.cumsum(loop_total[:-1], out=offsets[1:])
+    loops = numpy.arange(loop_total.sum()) + numpy.repeat(loop_start - offsets, loop_total)
+    return offsets, loop_verts[loops]
+
+# Next and Previous Corner in Face
+def cornerLinks(offsets, loop_total):
+    corner = numpy.arange(loop_total.sum())
+    first = numpy.repeat(offsets, loop_total)
+    last = first + numpy.repeat(loop_total, loop_total) - 1
+    return numpy.where(corner == last, first, corner + 1), numpy.where(corner == first, last, corner - 1)
+
+# Face Medians(Weighted by Edge Length like BMFace.calc_center_median_weighted)
+def faceMedians(co, offsets, loop_total, corners):
+    points = co[corners]
+    after, before = cornerLinks(offsets, loop_total)
+    length = numpy.sqrt(((points - points[after]) ** 2).sum(axis=1))
+    weight = length + length[before]
+    total = numpy.add.reduceat(weight, offsets)
+    median = numpy.add.reduceat(points * weight[:, None], offsets)
+    return numpy.divide(median, total[:, None], out=numpy.zeros_like(median), where=total[:, None] != 0.0)
+
+# Face Normals(Newell's Method)
+def faceNormals(co, offsets, loop_total, corners):
+    points = co[corners]
+    after = cornerLinks(offsets, loop_total)[0]
+    points = points - numpy.repeat(points[offsets], loop_total, axis=0)
+    normal = numpy.add.reduceat(numpy.cross(points, points[after]), offsets)
+    length = numpy.sqrt((normal ** 2).sum(axis=1))
+    return numpy.divide(normal, length[:, None], out=numpy.zeros_like(normal), where=length[:, None] != 0.0)
+
+# Face Vertex Lists(Reversed Winding) like ' 3 2 1'
+def faceLists(offsets, loop_total, corners):
+    lists = numpy.empty(len(loop_total), dtype=object)
+    for total in numpy.unique(loop_total).tolist():
+        select = numpy.flatnonzero(loop_total == total)
+        index = offsets[select, None] + numpy.arange(total - 1, -1, -1)
+        lists[select] = list(map((' {:d}' * total).format, *corners[index].T.tolist()))
+    return lists
+
+# SURF Writer
+class SurfWriter:
+    # Wrap File Handle
+    def __init__(self, fp):
+        self.fp = fp
+        self.lines = 0
+
+    # Write Lines
+    def write(self, text, lines=1):
+        self.fp.write(text)
+        self.lines = self.lines + lines
+
+    # Write Rows(Columns are Formatted in Chunks)
+    def writeRows(self, fmt, *columns):
+        for start in range(0, len(columns[0]), CHUNK):
+            rows = [column[start:start + CHUNK] for column in columns]
+            rows = [row.tolist() if hasattr(row, 'tolist') else row for row in rows]
+            text = ''.join(map(fmt.format, *rows))
+            self.write(text, text.count('\n'))
+
+    # Write Face Records(Two Side Normal if No Normals)
+    def writeFaces(self, heads, medians, normals, lists):
+        if normals is None:
+            self.writeRows(FACE_TWOSIDE, heads, medians[:, 0], medians[:, 1], medians[:, 2], lists)
+        else:
+            self.writeRows(FACE, heads, medians[:, 0], medians[:, 1], medians[:, 2],
+                normals[:, 0], normals[:, 1], normals[:, 2], lists)
+
+    # Write ZA Lines
+    def writeZA(self, za):
+        for i in range(0, len(za), 8):
+            line = ' '.join('{:d} {:.0f}'.format(*var) for var in za[i:i + 8])
+            self.write('ZA {}\n'.format(line))
+
+# Write SURF Body from Snapshot(With PCK Header if name)
+def writeSurf(fp, surf, name=None):
+    verts = surf['verts']
+    offsets = surf['offsets']
+    loop_total = surf['totals']
+    corners = surf['corners']
+    # Face Headers(Color, Lighting and Transparent)
+    heads, za = faceHeads(surf['records'], surf['mats'])
+
+    writer = SurfWriter(fp)
+
+    # PCK Header(Line Count from Vertex, Face and ZA Counts)
+    if name is not None:
+        length = len(verts) + sum(head.count('\n') + 3 for head in heads) + zaLength(len(za)) + 2
+        writer.write('PCK {} {:d}\n'.format(name, length))
+
+    # Header
+    writer.write('SURF\n')
+
+    # Vertexs
+    writer.writeRows('V {:.5f} {:.5f} {:.5f} {}\n', verts[:, 0], verts[:, 1], verts[:, 2], numpy.where(surf['smooth'], 'R', ''))
+
+    # Faces
+    # Median and Normal
+    medians = faceMedians(verts, offsets, loop_total, corners)
+    normals = None
+    if not surf['twoside']:
+        normals = faceNormals(verts, offsets, loop_total, corners)
+        # Flip Normal
+        if not surf['flip']:
+            normals = -normals
+    # Vertexs consist Face
+    writer.writeFaces(heads, medians, normals, faceLists(offsets, loop_total, corners))
+
+    # Footer
+    writer.write('E\n')
+
+    # For Transparent
+    writer.writeZA(za)
+
+    # Trailing Blank Line
+    if name is not None:
+        writer.write('\n', 0)
+
+    return writer.lines
+
+# Encode SURF Body to Text
+def encodeSurf(surf, name=None):
+    fp = io.StringIO()
+    writeSurf(fp, surf, name)
+    return fp.getvalue()
+
+# Encode SURF Bodies(Process Pool if Workers are Forked, Yielded in Order)
+def encodeParts(parts):
+    executor = forkPool() if len(parts) > 1 else None
+    if executor is not None:
+        with executor:
+            yield from executor.map(encodeSurf, *zip(*parts))
+    else:
+        for surf, name in parts:
+            yield encodeSurf(surf, name)
+
+# Write PCK Nodes in Order(Unchanged Parts are Taken from Cache if Given)
+def writeParts(fp, parts, cache=None):
+    if cache is None:
+        for text in encodeParts(parts):
+            fp.write(text)
+        return
+
+    # Cache Lookup
+    keys = [cache.key(surf, name) for surf, name in parts]
+    hits = [cache.has(key) for key in keys]
+    # Encode Changed Parts Only
+    encoded = encodeParts([part for part, hit in zip(parts, hits) if not hit])
+    for part, key, hit in zip(parts, keys, hits):
+        if hit:
+            text = cache.get(key)
+            # Evicted since Lookup
+            if text is None:
+                text = encodeSurf(*part)
+                cache.put(key, text)
+        else:
+            text = next(encoded)
+            cache.put(key, text)
+        fp.write(text)
+    cache.trim()
+
+# Mode of New Files(0o666 Masked by umask)
+def newFileMode():
+    mask = os.umask(0)
+    os.umask(mask)
+    return 0o666 & ~mask
+
+# Write File if Content Changed(Temp File and Atomic Rename, True if Written)
+def writeIfChanged(path, text, mode=None):
+    path = os.fsdecode(path)
+    data = text.replace('\n', os.linesep).encode('utf-8')
+    try:
+        with open(path, 'rb') as fp:
+            if fp.read() == data:
+                return False
+            # Keep Mode of Existing File
+            mode = stat.S_IMODE(os.fstat(fp.fileno()).st_mode)
+    except OSError:
+        pass
+    if mode is None:
+        mode = newFileMode()
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        # mkstemp Creates Files with 0o600
+        os.chmod(temp, mode)
+        os.replace(temp, path)
+    except BaseException:
+        os.remove(temp)
+        raise
+    return True
+
+# Write Part Files Concurrently(Counts of Written and Skipped Files)
+def writeFiles(paths, texts):
+    # umask is Read Once Here(Not Thread Safe)
+    mode = newFileMode()
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        written = sum(executor.map(writeIfChanged, paths, texts, repeat(mode)))
+    return written, len(paths) - written
+
+# Section Buffer(Rolled over to Temporary File past SPOOL)
+def spoolSection():
+    return tempfile.SpooledTemporaryFile(SPOOL, 'w+', encoding='utf-8')
+
+# Copy Sections to File in Order and Close them
+def copySections(fp, sections):
+    for section in sections:
+        with section:
+            section.seek(0)
+            shutil.copyfileobj(section, fp)